@@ -0,0 +1,29 @@
+"""
+conftest.py
+
+Shared pytest fixtures for the earthquake project.
+"""
+
+import functools
+
+import pytest
+
+from earthquakes.earthquakes import create_earthquake_db
+
+
+@functools.cache
+def _build_test_db() -> None:
+    """
+    Build the earthquake database once per process.
+    Shared by the pytest fixture below and by unittest's setUpClass.
+    """
+    create_earthquake_db(days=7)
+
+
+@pytest.fixture(scope="session")
+def earthquake_db() -> None:
+    """
+    Build the earthquake database once per test session.
+    Test classes that need it opt in with usefixtures.
+    """
+    _build_test_db()
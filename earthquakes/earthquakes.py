@@ -10,21 +10,56 @@ Utilities to:
 
 from __future__ import annotations
 
-import csv
+import contextlib
+import functools
 import sqlite3
+import sys
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Tuple
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple
 
+import ijson
 import requests
+from requests.adapters import HTTPAdapter
+
+if sys.version_info >= (3, 11):
+    # C parser for any ISO-8601 timestamp, no extra dependency
+    _parse_time = datetime.fromisoformat
+else:  # older fromisoformat rejects some fractional-second widths
+    from ciso8601 import parse_datetime as _parse_time
 
 BOUNDING_BOX_CSV = "bounding_box.csv"
 DB_DEFAULT_PATH = "earthquakes.db"
 INGV_URL = "https://webservices.ingv.it/fdsnws/event/1/query"
+SCHEMA_VERSION = 2
+MMAP_SIZE = 256 * 1024 * 1024
+
+# shared keep-alive session: repeat fetches reuse the TCP/TLS connection;
+# only one host is ever queried, so a single small pool is enough
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+# (ts, mag, latitude, longitude, place) with ts = UTC epoch seconds
+EarthquakeRow = Tuple[int, float, float, float, str]
+
 
-EarthquakeRow = Tuple[str, str, float, float, float, str]
+class BoundingBox(NamedTuple):
+    """Geographic bounding box; field names match the CSV header and INGV params."""
 
+    minlatitude: float
+    maxlatitude: float
+    minlongitude: float
+    maxlongitude: float
 
-def read_bounding_box(csv_path: str = BOUNDING_BOX_CSV) -> Dict[str, float]:
+
+# columns bounding_box.csv must provide, built once at import
+_BBOX_REQUIRED = frozenset(BoundingBox._fields)
+# header as written by write_bounding_box.py, in BoundingBox field order
+_BBOX_HEADER = list(BoundingBox._fields)
+
+
+@functools.lru_cache(maxsize=4)
+def read_bounding_box(csv_path: str = BOUNDING_BOX_CSV) -> BoundingBox:
     """
     Read bounding box from a 2-line CSV:
     header: minlatitude,maxlatitude,minlongitude,maxlongitude
@@ -37,8 +72,9 @@ def read_bounding_box(csv_path: str = BOUNDING_BOX_CSV) -> Dict[str, float]:
 
     Returns
     -------
-    dict[str, float]
-        Bounding box dict with required keys.
+    BoundingBox
+        Immutable bounding box. The result is cached per path, so the
+        file is parsed once per process.
 
     Raises
     ------
@@ -47,17 +83,22 @@ def read_bounding_box(csv_path: str = BOUNDING_BOX_CSV) -> Dict[str, float]:
     FileNotFoundError
         If the CSV file does not exist.
     """
-    required = {"minlatitude", "maxlatitude", "minlongitude", "maxlongitude"}
+    # two short unquoted lines: str.split is enough, no csv tokenizer needed
+    lines = Path(csv_path).read_text(encoding="utf-8").splitlines()
+    if len(lines) < 2:
+        raise ValueError("bounding_box.csv must contain header + one values row")
+
+    keys = lines[0].split(",")
+    values = lines[1].split(",")
 
-    with open(csv_path, newline="", encoding="utf-8") as file:
-        reader = csv.reader(file)
+    # fast path: canonical header, values map positionally onto the fields
+    if keys == _BBOX_HEADER and len(values) == len(keys):
         try:
-            keys = next(reader)
-            values = next(reader)
-        except StopIteration as exc:
-            raise ValueError("bounding_box.csv must contain header + one values row") from exc
+            return BoundingBox(*map(float, values))
+        except ValueError as exc:
+            raise ValueError("bounding_box.csv values must be numeric") from exc
 
-    if not required.issubset(set(keys)):
+    if not _BBOX_REQUIRED.issubset(keys):
         raise ValueError(
             "bounding_box.csv must contain columns: "
             "minlatitude,maxlatitude,minlongitude,maxlongitude"
@@ -65,26 +106,48 @@ def read_bounding_box(csv_path: str = BOUNDING_BOX_CSV) -> Dict[str, float]:
 
     raw = dict(zip(keys, values))
     try:
-        return {k: float(raw[k]) for k in required}
+        return BoundingBox(*(float(raw[k]) for k in BoundingBox._fields))
     except (KeyError, ValueError) as exc:
         raise ValueError("bounding_box.csv values must be numeric") from exc
 
 
-def gather_earthquakes(days: int) -> List[EarthquakeRow]:
+def _extract(event: dict) -> Optional[tuple]:
     """
-    Fetch earthquakes from INGV for the last `days` days within the bounding box.
+    Pull (time, mag, latitude, longitude, place) out of one INGV feature.
 
-    Parameters
-    ----------
-    days : int
-        Days back from now (UTC).
+    The GeoJSON layout is fixed, so fields are indexed directly under a
+    single try block instead of chained .get() calls with defaults.
+    Returns None when a required field is missing or null.
+    """
+    try:
+        props = event["properties"]
+        coords = event["geometry"]["coordinates"]
+        fields = (props["time"], props["mag"], coords[1], coords[0], props.get("place", ""))
+    except (KeyError, IndexError, TypeError):
+        return None
+    if None in fields[:4]:
+        return None
+    return fields
 
-    Returns
-    -------
-    list[EarthquakeRow]
-        Rows: (day, time, mag, latitude, longitude, place)
+
+def _open_ingv(
+    days: int,
+    bounding_box: Optional[BoundingBox] = None,
+) -> Tuple[requests.Response, Iterator[tuple]]:
     """
-    bounding_box = read_bounding_box()
+    Send the INGV query and position a streaming parser at the features.
+
+    The HTTP status and the presence of a "features" array are checked
+    before returning. The caller owns the returned response and must
+    close it; the parser events are consumed by `_iter_rows`.
+
+    Raises
+    ------
+    ValueError
+        If the response is not valid JSON or has no "features" array.
+    """
+    if bounding_box is None:
+        bounding_box = read_bounding_box()
 
     endtime = datetime.now(timezone.utc)
     starttime = endtime - timedelta(days=days)
@@ -93,53 +156,154 @@ def gather_earthquakes(days: int) -> List[EarthquakeRow]:
         "format": "geojson",
         "starttime": starttime.strftime("%Y-%m-%dT%H:%M:%S"),
         "endtime": endtime.strftime("%Y-%m-%dT%H:%M:%S"),
-        "minlatitude": bounding_box["minlatitude"],
-        "maxlatitude": bounding_box["maxlatitude"],
-        "minlongitude": bounding_box["minlongitude"],
-        "maxlongitude": bounding_box["maxlongitude"],
+        "minlatitude": bounding_box.minlatitude,
+        "maxlatitude": bounding_box.maxlatitude,
+        "minlongitude": bounding_box.minlongitude,
+        "maxlongitude": bounding_box.maxlongitude,
     }
 
-    response = requests.get(INGV_URL, params=params, timeout=30)
-    response.raise_for_status()
-    events = response.json()
-
-    earthquakes: List[EarthquakeRow] = []
+    # stream the GeoJSON and parse features one at a time instead of
+    # materializing the whole payload with response.json(); use_float makes
+    # the C parser emit floats directly instead of Decimal objects
+    response = _SESSION.get(INGV_URL, params=params, timeout=30, stream=True)
+    try:
+        response.raise_for_status()
 
-    for event in events.get("features", []):
-        props = event.get("properties", {})
-        geom = event.get("geometry", {})
-        coords = geom.get("coordinates", [None, None, None])
+        # FDSN services answer 204 with an empty body when nothing matches
+        if response.status_code == 204:
+            return response, iter(())
 
-        time_str = props.get("time")
-        mag = props.get("mag")
+        response.raw.decode_content = True
 
-        if time_str is None or mag is None or coords[0] is None or coords[1] is None:
-            continue
+        parser = ijson.parse(response.raw, use_float=True)
 
-        # INGV time can be "...%f" or without microseconds
+        # fail as soon as the document is known to lack a "features" array
         try:
-            t = datetime.strptime(time_str, "%Y-%m-%dT%H:%M:%S.%f")
-        except ValueError:
-            t = datetime.strptime(time_str, "%Y-%m-%dT%H:%M:%S")
-
-        day = t.strftime("%Y-%m-%d")
-        tm = t.strftime("%H:%M:%S")
-
-        earthquakes.append(
-            (
-                day,
-                tm,
-                float(mag),
-                float(coords[1]),
-                float(coords[0]),
-                str(props.get("place", "")),
-            )
-        )
+            for prefix, kind, _ in parser:
+                if prefix == "features" and kind == "start_array":
+                    break
+            else:
+                raise ValueError("INGV response has no 'features' array")
+        except ijson.JSONError as exc:
+            raise ValueError("INGV response is not valid JSON") from exc
+    except BaseException:
+        response.close()
+        raise
+
+    return response, parser
+
+
+def _iter_rows(events: Iterator[tuple]) -> Iterator[EarthquakeRow]:
+    """
+    Yield rows from parser events positioned inside the "features" array.
+
+    Raises
+    ------
+    ValueError
+        If the rest of the body is not valid JSON.
+    """
+    try:
+        for event in ijson.items(events, "features.item"):
+            fields = _extract(event)
+            if fields is None:
+                continue
+            time_str, mag, lat, lon, place = fields
+
+            # INGV time can be "...%f" or without microseconds; both parse
+            try:
+                t = _parse_time(time_str)
+            except ValueError:
+                continue
+
+            # INGV times carry no offset and are UTC
+            if t.tzinfo is None:
+                t = t.replace(tzinfo=timezone.utc)
+
+            # JSON integers (e.g. "mag": 3) still arrive as int; keep rows float
+            yield (int(t.timestamp()), float(mag), float(lat), float(lon), str(place))
+    except ijson.JSONError as exc:
+        raise ValueError("INGV response is not valid JSON") from exc
+
+
+def iter_earthquakes(
+    days: int,
+    bounding_box: Optional[BoundingBox] = None,
+) -> Iterator[EarthquakeRow]:
+    """
+    Stream earthquakes from INGV for the last `days` days within the bounding box.
+
+    Parameters
+    ----------
+    days : int
+        Days back from now (UTC).
+    bounding_box : BoundingBox, optional
+        Area to query; read from bounding_box.csv when omitted.
+
+    Yields
+    ------
+    EarthquakeRow
+        Rows: (ts, mag, latitude, longitude, place)
+
+    Raises
+    ------
+    ValueError
+        If the response is not valid JSON or has no "features" array.
+        An HTTP 204 (no matching events) yields no rows instead.
+    """
+    response, events = _open_ingv(days, bounding_box)
+    with response:
+        yield from _iter_rows(events)
 
-    return earthquakes
+
+def gather_earthquakes(
+    days: int,
+    bounding_box: Optional[BoundingBox] = None,
+) -> List[EarthquakeRow]:
+    """
+    Fetch earthquakes from INGV for the last `days` days within the bounding box.
+
+    Parameters
+    ----------
+    days : int
+        Days back from now (UTC).
+    bounding_box : BoundingBox, optional
+        Area to query; read from bounding_box.csv when omitted.
+
+    Returns
+    -------
+    list[EarthquakeRow]
+        Rows: (ts, mag, latitude, longitude, place)
+
+    Raises
+    ------
+    ValueError
+        If the response is not valid JSON or has no "features" array.
+    """
+    return list(iter_earthquakes(days, bounding_box))
 
 
-def create_earthquake_db(days: int, db_path: str = DB_DEFAULT_PATH) -> None:
+@contextlib.contextmanager
+def _connect(db_path: str) -> Iterator[sqlite3.Connection]:
+    """
+    Open `db_path` in autocommit mode with memory-mapped reads.
+
+    isolation_level=None disables the sqlite3 module's implicit
+    transactions, so callers issue BEGIN/COMMIT themselves. The
+    connection is closed on exit.
+    """
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        yield conn
+    finally:
+        conn.close()
+
+
+def create_earthquake_db(
+    days: int,
+    db_path: str = DB_DEFAULT_PATH,
+    bounding_box: Optional[BoundingBox] = None,
+) -> None:
     """
     Fetch earthquakes for `days` days and store them in SQLite.
 
@@ -149,39 +313,91 @@ def create_earthquake_db(days: int, db_path: str = DB_DEFAULT_PATH) -> None:
         Days of data to fetch.
     db_path : str
         SQLite database path.
+    bounding_box : BoundingBox, optional
+        Area to query; read from bounding_box.csv when omitted.
     """
-    earthquakes = gather_earthquakes(days)
+    # the request, status and "features" checks run here, before the
+    # database is opened; a failed fetch leaves it untouched (or absent)
+    response, events = _open_ingv(days, bounding_box)
+
+    with response, _connect(db_path) as conn:
+        # WAL + NORMAL sync: one fsync per transaction instead of per page write
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
 
-    with sqlite3.connect(db_path) as conn:
         cursor = conn.cursor()
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS earthquakes_db(
-                day TEXT,
-                time TEXT,
-                mag REAL,
-                latitude REAL,
-                longitude REAL,
-                place TEXT
-            );
-            """
-        )
+        # schema changes and the bulk insert share one explicit transaction;
+        # rows are streamed straight from the INGV response into executemany,
+        # so other writers are blocked until the body has been downloaded
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # a table from an older layout is set aside and its rows are
+            # copied into the new one below, so no stored event is lost
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            legacy_columns = set()
+            if version != SCHEMA_VERSION:
+                legacy_columns = {
+                    row[1] for row in conn.execute("PRAGMA table_info(earthquakes_db);")
+                }
+                if legacy_columns:
+                    cursor.execute("ALTER TABLE earthquakes_db RENAME TO earthquakes_db_old;")
+
+            cursor.execute(
+                """
+                CREATE TABLE IF NOT EXISTS earthquakes_db(
+                    ts INTEGER,
+                    mag REAL,
+                    latitude REAL,
+                    longitude REAL,
+                    place TEXT,
+                    PRIMARY KEY(ts, mag, latitude, longitude, place)
+                ) WITHOUT ROWID;
+                """
+            )
 
-        cursor.execute(
-            """
-            CREATE UNIQUE INDEX IF NOT EXISTS uq_earthquakes
-            ON earthquakes_db(day, time, mag, latitude, longitude, place);
-            """
-        )
+            # lets ORDER BY mag DESC ... LIMIT walk the index and stop after k rows
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_mag_ts
+                ON earthquakes_db(mag DESC, ts);
+                """
+            )
 
-        cursor.executemany(
-            """
-            INSERT OR IGNORE INTO earthquakes_db(day, time, mag, latitude, longitude, place)
-            VALUES (?, ?, ?, ?, ?, ?);
-            """,
-            earthquakes,
-        )
+            if legacy_columns:
+                # the first layout stored UTC day/time strings instead of ts
+                ts_expr = (
+                    "ts"
+                    if "ts" in legacy_columns
+                    else "CAST(strftime('%s', day || ' ' || time) AS INTEGER)"
+                )
+                cursor.execute(
+                    f"""
+                    INSERT OR IGNORE INTO earthquakes_db(ts, mag, latitude, longitude, place)
+                    SELECT {ts_expr}, mag, latitude, longitude, place
+                    FROM earthquakes_db_old;
+                    """
+                )
+                cursor.execute("DROP TABLE earthquakes_db_old;")
+            if version != SCHEMA_VERSION:
+                cursor.execute(f"PRAGMA user_version={SCHEMA_VERSION};")
+
+            cursor.executemany(
+                """
+                INSERT OR IGNORE INTO earthquakes_db(ts, mag, latitude, longitude, place)
+                VALUES (?, ?, ?, ?, ?);
+                """,
+                _iter_rows(events),
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+        # refresh planner statistics so query_db picks idx_mag_ts
+        cursor.execute("ANALYZE earthquakes_db;")
 
 
 def query_db(
@@ -199,30 +415,62 @@ def query_db(
     list[EarthquakeRow]
         Rows ordered by magnitude decreasing.
     """
-    date_limit = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    cutoff = int((datetime.now(timezone.utc) - timedelta(days=days)).timestamp())
 
-    with sqlite3.connect(db_path) as conn:
+    with _connect(db_path) as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
-            SELECT day, time, mag, latitude, longitude, place
+            SELECT ts, mag, latitude, longitude, place
             FROM earthquakes_db
             WHERE mag >= ?
-              AND day >= ?
+              AND ts >= ?
             ORDER BY mag DESC
             LIMIT ?;
             """,
-            (min_magnitude, date_limit, k),
+            (min_magnitude, cutoff, k),
         )
         return cursor.fetchall()
 
 
+def query_db_mags(days: int, db_path: str = DB_DEFAULT_PATH) -> List[float]:
+    """
+    Query the magnitudes of all earthquakes in the last `days` days.
+
+    Only `mag` is selected, so SQLite answers from idx_mag_ts alone
+    without reading table pages.
+
+    Returns
+    -------
+    list[float]
+        Magnitudes ordered decreasing.
+    """
+    cutoff = int((datetime.now(timezone.utc) - timedelta(days=days)).timestamp())
+
+    with _connect(db_path) as conn:
+        cursor = conn.execute(
+            """
+            SELECT mag
+            FROM earthquakes_db
+            WHERE ts >= ?
+            ORDER BY mag DESC;
+            """,
+            (cutoff,),
+        )
+        return [mag for (mag,) in cursor]
+
+
 def print_earthquakes(earthquakes: List[EarthquakeRow]) -> None:
     """
-    Print earthquake rows in a readable format.
+    Print earthquake rows in a readable format (day and time in UTC).
+
+    The output is built in memory and written with a single call.
     """
-    for day, tm, mag, lat, lon, place in earthquakes:
-        print(
-            f"day: {day}, time: {tm}, magnitude: {mag}\n"
-            f"lat: {lat}, lon: {lon}, place: {place}\n"
-        )
\ No newline at end of file
+    out = []
+    for ts, mag, lat, lon, place in earthquakes:
+        t = datetime.fromtimestamp(ts, timezone.utc)
+        out.append(
+            f"day: {t:%Y-%m-%d}, time: {t:%H:%M:%S}, magnitude: {mag}\n"
+            f"lat: {lat}, lon: {lon}, place: {place}\n\n"
+        )
+    sys.stdout.write("".join(out))
@@ -0,0 +1,140 @@
+import sqlite3
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from earthquakes.earthquakes import create_earthquake_db
+
+ROWS = [
+    (4071031200, 3.1, 42.0, 13.0, "A"),
+    (4071034800, 4.5, 43.0, 12.0, "B"),
+]
+
+
+def _build(path, rows, response=None):
+    response = response or MagicMock()
+    with patch("earthquakes.earthquakes._open_ingv", return_value=(response, None)), \
+            patch("earthquakes.earthquakes._iter_rows", return_value=iter(rows)):
+        create_earthquake_db(7, str(path))
+
+
+def _query(path, sql, params=()):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def _legacy_db(path, rows):
+    # first released layout: UTC day/time strings, rowid table + unique index
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE earthquakes_db(
+            day TEXT, time TEXT, mag REAL, latitude REAL, longitude REAL, place TEXT
+        );
+        """
+    )
+    conn.execute(
+        """
+        CREATE UNIQUE INDEX uq_earthquakes
+        ON earthquakes_db(day, time, mag, latitude, longitude, place);
+        """
+    )
+    conn.executemany("INSERT INTO earthquakes_db VALUES (?, ?, ?, ?, ?, ?);", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_query_uses_magnitude_index_without_sort(tmp_path):
+    path = tmp_path / "earthquakes.db"
+    _build(path, ROWS)
+
+    plan = " ".join(
+        row[-1]
+        for row in _query(
+            path,
+            """
+            EXPLAIN QUERY PLAN
+            SELECT ts, mag, latitude, longitude, place
+            FROM earthquakes_db
+            WHERE mag >= ? AND ts >= ?
+            ORDER BY mag DESC
+            LIMIT ?;
+            """,
+            (0.0, 0, 5),
+        )
+    )
+
+    assert "idx_mag_ts" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_duplicate_rows_are_ignored(tmp_path):
+    path = tmp_path / "earthquakes.db"
+    _build(path, ROWS + [ROWS[0]])
+    _build(path, ROWS)
+
+    assert _query(path, "SELECT COUNT(*) FROM earthquakes_db;") == [(len(ROWS),)]
+
+
+def test_failed_fetch_keeps_existing_database(tmp_path):
+    path = tmp_path / "earthquakes.db"
+
+    # database in an older layout, as left by a previous release
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE earthquakes_db(day TEXT, time TEXT, mag REAL);")
+    conn.execute("INSERT INTO earthquakes_db VALUES ('2024-01-02', '10:00:00', 3.1);")
+    conn.commit()
+    conn.close()
+
+    with patch("earthquakes.earthquakes._open_ingv", side_effect=ConnectionError):
+        with pytest.raises(ConnectionError):
+            create_earthquake_db(7, str(path))
+
+    assert _query(path, "SELECT COUNT(*) FROM earthquakes_db;") == [(1,)]
+
+
+def test_legacy_rows_are_migrated(tmp_path):
+    path = tmp_path / "earthquakes.db"
+    _legacy_db(path, [("2024-01-02", "10:00:00", 3.1, 42.0, 13.0, "A")])
+
+    _build(path, ROWS)
+
+    assert _query(path, "SELECT * FROM earthquakes_db ORDER BY ts;") == [
+        (1704189600, 3.1, 42.0, 13.0, "A"),
+        *ROWS,
+    ]
+    assert _query(path, "PRAGMA user_version;") == [(2,)]
+    assert _query(
+        path, "SELECT name FROM sqlite_master WHERE name = 'earthquakes_db_old';"
+    ) == []
+
+
+def test_response_is_closed_when_database_cannot_be_opened(tmp_path):
+    response = MagicMock()
+
+    with patch("earthquakes.earthquakes._connect", side_effect=sqlite3.OperationalError):
+        with pytest.raises(sqlite3.OperationalError):
+            _build(tmp_path / "earthquakes.db", ROWS, response)
+
+    response.__exit__.assert_called_once()
+
+
+def test_failed_stream_rolls_back_migration(tmp_path):
+    path = tmp_path / "earthquakes.db"
+    _legacy_db(path, [("2024-01-02", "10:00:00", 3.1, 42.0, 13.0, "A")])
+
+    def rows():
+        yield ROWS[0]
+        raise ConnectionError
+
+    with pytest.raises(ConnectionError):
+        _build(path, rows())
+
+    # the rename, new table and partial insert are all rolled back
+    assert _query(path, "SELECT day, time, mag FROM earthquakes_db;") == [
+        ("2024-01-02", "10:00:00", 3.1)
+    ]
+    assert _query(path, "PRAGMA user_version;") == [(0,)]
@@ -0,0 +1,55 @@
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from earthquakes.earthquakes import BoundingBox, gather_earthquakes
+
+BOUNDING_BOX = BoundingBox(
+    minlatitude=35.0,
+    maxlatitude=47.5,
+    minlongitude=5.0,
+    maxlongitude=20.0,
+)
+
+
+def _fake_response(body, status_code=200):
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = status_code
+    response.raise_for_status.return_value = None
+    response.raw = io.BytesIO(body)
+    return response
+
+
+def _gather(response):
+    with patch("earthquakes.earthquakes._SESSION.get", return_value=response):
+        return gather_earthquakes(7, BOUNDING_BOX)
+
+
+def test_gather_earthquakes_invalid_response_raises_value_error():
+    with pytest.raises(ValueError):
+        _gather(_fake_response(b'{"not_features": []}'))
+
+
+def test_gather_earthquakes_returns_float_fields():
+    body = (
+        b'{"type": "FeatureCollection", "features": [{'
+        b'"properties": {"time": "2024-01-02T10:00:00", "mag": 3, "place": "A"},'
+        b'"geometry": {"coordinates": [13, 42, 10]}}]}'
+    )
+
+    rows = _gather(_fake_response(body))
+
+    assert rows == [(1704189600, 3.0, 42.0, 13.0, "A")]
+    assert all(isinstance(value, float) for value in rows[0][1:4])
+
+
+@pytest.mark.parametrize("body", [b"", b'{"features": [{"properties": '])
+def test_gather_earthquakes_malformed_body_raises_value_error(body):
+    with pytest.raises(ValueError):
+        _gather(_fake_response(body))
+
+
+def test_gather_earthquakes_no_content_returns_no_rows():
+    assert _gather(_fake_response(b"", status_code=204)) == []
@@ -2,27 +2,35 @@
 write_bounding_box.py
 
 Create (or overwrite) bounding_box.csv with a default Italy bounding box.
+The file is left untouched if it already holds the same box.
 """
 
-import csv
+from pathlib import Path
 
 BOUNDING_BOX_CSV = "bounding_box.csv"
 
+# Italy bounding box, pre-rendered: four constant floats need no CSV quoting
+_BBOX_CSV_TEXT = (
+    "minlatitude,maxlatitude,minlongitude,maxlongitude\r\n"
+    "35.0,47.5,5.0,20.0\r\n"
+)
+
+
+def _same_contents(path: Path, text: str) -> bool:
+    """Return True if `path` exists and already contains exactly `text`."""
+    return path.is_file() and path.read_bytes() == text.encode("utf-8")
+
 
 def main() -> None:
     """Write a 2-line CSV containing bounding box coordinates for Italy."""
-    bounding_box = {
-        "minlatitude": 35.0,
-        "maxlatitude": 47.5,
-        "minlongitude": 5.0,
-        "maxlongitude": 20.0,
-    }
+    path = Path(BOUNDING_BOX_CSV)
+
+    # repeated runs (e.g. from test setup) skip the rewrite entirely
+    if _same_contents(path, _BBOX_CSV_TEXT):
+        return
 
-    with open(BOUNDING_BOX_CSV, "w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        writer.writerow(bounding_box.keys())
-        writer.writerow(bounding_box.values())
+    path.write_text(_BBOX_CSV_TEXT, encoding="utf-8", newline="")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()